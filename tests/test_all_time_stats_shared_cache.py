@@ -0,0 +1,80 @@
+"""
+Behaviour of the all_time_stats shared cache, on the in-process MemoryRedis backend
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from all_time_stats_bench import load_plugin  # noqa: E402
+
+plugin = load_plugin()
+
+PROFILE = {"id": 1, "names": [{"name": "player"}]}
+STATS = {"tot_sessions": 12, "avg_combat": 87.5}
+
+
+@pytest.fixture
+def cache():
+    return plugin.SharedStatsCache(plugin.MemoryRedis(), ttl=60)
+
+
+def test_stats_round_trip(cache):
+    namespace, found = cache.get_many(["p1"], "fingerprint")
+    assert found == {}
+    cache.set_many(namespace, {"p1": (PROFILE, STATS)})
+    _, found = cache.get_many(["p1", "p2"], "fingerprint")
+    assert found == {"p1": (PROFILE, STATS)}
+    assert cache.stats() == {"enabled": 1, "hits": 1, "misses": 2, "errors": 0}
+
+
+def test_generation_bump_invalidates_stats(cache):
+    namespace, _ = cache.get_many(["p1"], "fingerprint")
+    cache.set_many(namespace, {"p1": (PROFILE, STATS)})
+    cache.bump_generation()
+    new_namespace, found = cache.get_many(["p1"], "fingerprint")
+    assert found == {}
+    assert new_namespace != namespace
+    # Stats computed before the bump can't be stored in the new generation
+    cache.set_many(namespace, {"p1": (PROFILE, STATS)})
+    assert cache.get_many(["p1"], "fingerprint")[1] == {}
+
+
+def test_fingerprints_are_isolated(cache):
+    namespace, _ = cache.get_many(["p1"], "fingerprint")
+    cache.set_many(namespace, {"p1": (PROFILE, STATS)})
+    assert cache.get_many(["p1"], "other")[1] == {}
+    assert cache.get_many(["p1"], "fingerprint")[1] == {"p1": (PROFILE, STATS)}
+
+
+@pytest.mark.parametrize("value", ["not json", "[1, 2, 3]", '[{"id": 1}, [1]]', "null"])
+def test_corrupt_entry_is_a_miss(cache, value):
+    namespace, _ = cache.get_many(["p1"], "fingerprint")
+    cache.client.set(f"{namespace}:stats:p1", value)
+    _, found = cache.get_many(["p1"], "fingerprint")
+    assert found == {}
+    assert cache.stats()["errors"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_partial_stats_are_not_stored(cache):
+    namespace, _ = cache.get_many(["p1"], "fingerprint")
+    cache.set_many(namespace, {"p1": (PROFILE, dict(STATS, avg_combat=None))})
+    cache.set_many(namespace, {"p2": (None, STATS)})
+    assert cache.get_many(["p1", "p2"], "fingerprint")[1] == {}
+
+
+def test_ids_round_trip(cache):
+    cache.set_ids({"p1": 7, "p2": None})
+    cache.bump_generation()
+    assert cache.get_ids(["p1", "p2"]) == {"p1": 7}
+
+
+def test_disabled_cache_stores_nothing():
+    cache = plugin.SharedStatsCache(None, ttl=60)
+    assert cache.get_many(["p1"], "fingerprint") == (None, {})
+    cache.set_ids({"p1": 7})
+    assert cache.get_ids(["p1"]) == {}
+    assert cache.stats()["enabled"] == 0